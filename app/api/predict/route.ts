@@ -74,7 +74,7 @@ export async function POST(req: NextRequest) {
   const mlUrl = process.env.ML_SERVICE_URL;
   const mlLocal = process.env.ML_SERVICE_LOCAL === 'true';
   if (!mlUrl && mlLocal) {
-    const modelPath = path.join(process.cwd(), 'ml', 'models', 'stock_predictor.pkl');
+    const modelPath = path.join(process.cwd(), 'ml', 'models', 'stock_predictor.ubj');
     if (!fs.existsSync(modelPath)) {
       return new Response(JSON.stringify({ error: 'Model not trained', details: 'Run ml/train_model.py to create the model first' }), { status: 400 });
     }
@@ -11,7 +11,6 @@ import csv
 import requests
 from dotenv import load_dotenv
 from pathlib import Path
-from datetime import datetime
 
 load_dotenv()
 
@@ -38,8 +37,9 @@ def fetch_daily(symbol: str):
         if not ts:
             print(f'No time series for {symbol}: {data}')
             return None
-        # convert to list of (date, close) sorted ascending by date
-        items = sorted(((datetime.fromisoformat(d), float(v['4. close'])) for d, v in ts.items()), key=lambda x: x[0])
+        # convert to list of (date, close) sorted ascending by date; the
+        # 'YYYY-MM-DD' keys sort chronologically as strings, so skip parsing
+        items = sorted(((d, float(v['4. close'])) for d, v in ts.items()), key=lambda x: x[0])
         return items
     except Exception as e:
         print(f'Error fetching daily for {symbol}: {e}')
@@ -8,18 +8,18 @@ import os
 import sys
 import json
 import requests
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
-import joblib
 import numpy as np
-import pandas as pd
+from xgboost import XGBRegressor
 
 load_dotenv()
 
 API_KEY = os.getenv('alphavantage_api_key')
 ROOT = Path(__file__).resolve().parent
 MODELS_DIR = ROOT / 'models'
-MODEL_PKL = MODELS_DIR / 'stock_predictor.pkl'
+MODEL_FILE = MODELS_DIR / 'stock_predictor.ubj'
 FEATURES_JSON = MODELS_DIR / 'feature_names.json'
 METRICS_JSON = MODELS_DIR / 'metrics.json'
 
@@ -34,10 +34,12 @@ def fetch_overview(symbol: str):
         raise ValueError('No overview data for ' + symbol)
     return data
 
+@lru_cache(maxsize=1)
 def load_model():
-    if not MODEL_PKL.exists():
+    if not MODEL_FILE.exists():
         raise FileNotFoundError('Model not found; run ml/train_model.py')
-    model = joblib.load(MODEL_PKL)
+    model = XGBRegressor()
+    model.load_model(MODEL_FILE)
     with open(FEATURES_JSON, 'r', encoding='utf8') as f:
         features = json.load(f)
     metrics = {}
@@ -47,17 +49,17 @@ def load_model():
     return model, features, metrics
 
 def build_feature_vector(overview, features):
-    row = {}
-    for f in features:
+    # fill a float32 row directly; missing values stay NaN and follow the
+    # trees' default branches (a single-row median fill never filled anything)
+    X = np.full((1, len(features)), np.nan, dtype=np.float32)
+    for i, f in enumerate(features):
         # try several keys
         val = overview.get(f) or overview.get(f.upper()) or overview.get(f.lower())
         try:
-            row[f] = float(val)
+            X[0, i] = float(val)
         except Exception:
-            row[f] = np.nan
-    df = pd.DataFrame([row])
-    df = df.fillna(df.median(numeric_only=True))
-    return df
+            pass
+    return X
 
 def confidence_from_metrics(metrics, pred):
     mae = metrics.get('mae') or 0.0
@@ -70,6 +72,18 @@ def confidence_from_metrics(metrics, pred):
         return 'medium'
     return 'low'
 
+def predict_one(ticker: str):
+    """Predict one ticker in-process; the model is loaded once per process."""
+    ticker = ticker.upper()
+    if API_KEY is None:
+        raise RuntimeError('alphavantage_api_key not set')
+    model, features, metrics = load_model()
+    overview = fetch_overview(ticker)
+    X = build_feature_vector(overview, features)
+    pred = model.predict(X)[0]
+    conf = confidence_from_metrics(metrics, pred)
+    return {'ticker': ticker, 'predicted_return_6m': float(round(float(pred), 4)), 'confidence': conf}
+
 def main():
     if len(sys.argv) < 2:
         print(json.dumps({'error': 'ticker required'}))
@@ -79,13 +93,7 @@ def main():
         print(json.dumps({'error': 'alphavantage_api_key not set'}))
         sys.exit(1)
 
-    model, features, metrics = load_model()
-    overview = fetch_overview(ticker)
-    X = build_feature_vector(overview, features)
-    pred = model.predict(X)[0]
-    conf = confidence_from_metrics(metrics, pred)
-    out = {'ticker': ticker, 'predicted_return_6m': float(round(float(pred), 4)), 'confidence': conf}
-    print(json.dumps(out))
+    print(json.dumps(predict_one(ticker)))
 
 if __name__ == '__main__':
     main()